@@ -18,6 +18,9 @@ class Settings(BaseSettings):
     OPENAI_MAX_TOKENS_TEXT: int = 2200
     OPENAI_TEMPERATURE: float = 1.0
     OPENAI_TIMEOUT_S: int = 120
+    OPENAI_MAX_CONNECTIONS: int = 64
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 32
+    OPENAI_MAX_CONCURRENCY: int = 8
     
     # Security
     SECRET_KEY: str = "your-secret-key-here"
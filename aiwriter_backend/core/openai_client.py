@@ -1,37 +1,58 @@
 """
 OpenAI client singleton and helper functions.
 """
+import asyncio
 import json
 import logging
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
 # Singleton instance
-_openai_client: Optional[OpenAI] = None
+_openai_client: Optional[AsyncOpenAI] = None
 
+# Caps in-flight API calls so concurrent generation stays under the rate limit
+_openai_semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
 
-def get_openai() -> OpenAI:
-    """Get OpenAI client singleton."""
+
+def get_openai() -> AsyncOpenAI:
+    """Get async OpenAI client singleton."""
     global _openai_client
     
     if _openai_client is None:
         if not settings.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY is required but not set")
         
+        # The SDK sends its own timeout with every request, overriding the
+        # http_client's, so the connect bound must go through AsyncOpenAI
+        timeout = httpx.Timeout(settings.OPENAI_TIMEOUT_S, connect=5.0)
+        
+        # Explicit pool limits: the SDK default pool is too small for concurrent
+        # text/image calls and surfaces as httpx.PoolTimeout under bursts
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            timeout=timeout
+        )
+        
         # Initialize OpenAI client with compatibility check
         try:
-            _openai_client = OpenAI(
+            _openai_client = AsyncOpenAI(
                 api_key=settings.OPENAI_API_KEY,
-                timeout=settings.OPENAI_TIMEOUT_S
+                timeout=timeout,
+                http_client=http_client
             )
         except TypeError as e:
             if "unexpected keyword argument" in str(e):
-                # Fallback for older OpenAI SDK versions
+                # Fallback for older OpenAI SDK versions; keep the pooled client
+                # (its own timeout then applies) instead of leaking it
                 logger.warning("Using fallback OpenAI client initialization (older SDK version)")
-                _openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+                _openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
             else:
                 raise
         logger.info(f"OpenAI client initialized with model: {settings.OPENAI_TEXT_MODEL}")
@@ -39,6 +60,15 @@ def get_openai() -> OpenAI:
     return _openai_client
 
 
+async def close_openai() -> None:
+    """Close the singleton's connection pool; the next get_openai() builds a fresh client."""
+    global _openai_client
+    
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
+
+
 async def run_text_structured(messages: List[Dict[str, str]], schema: Dict[str, Any], **opts) -> Dict[str, Any]:
     """
     Generate structured JSON using OpenAI chat completions with JSON schema.
@@ -80,7 +110,8 @@ async def run_text_structured(messages: List[Dict[str, str]], schema: Dict[str,
     try:
         logger.info(f"Calling OpenAI with structured JSON output for model: {options['model']}")
         
-        response = client.chat.completions.create(**options)
+        async with _openai_semaphore:
+            response = await client.chat.completions.create(**options)
         
         content = response.choices[0].message.content
         logger.info(f"OpenAI structured response received, length: {len(content) if content else 0}")
@@ -141,7 +172,8 @@ async def run_text(messages: List[Dict[str, str]], **opts) -> str:
         if settings.OPENAI_TEXT_MODEL == "gpt-5":
             logger.info(f"GPT-5 parameters: temperature removed (only supports default 1.0)")
         
-        response = client.chat.completions.create(**options)
+        async with _openai_semaphore:
+            response = await client.chat.completions.create(**options)
         
         content = response.choices[0].message.content
         logger.info(f"OpenAI response received, length: {len(content) if content else 0}")
@@ -169,13 +201,14 @@ async def gen_image(prompt: str, size: str = "1024x1024", quality: str = "high")
     
     try:
         logger.info(f"Generating image with prompt: {prompt[:100]}...")
-        response = client.images.generate(
-            model=settings.OPENAI_IMAGE_MODEL,
-            prompt=prompt,
-            size=size,
-            quality=quality,
-            n=1
-        )
+        async with _openai_semaphore:
+            response = await client.images.generate(
+                model=settings.OPENAI_IMAGE_MODEL,
+                prompt=prompt,
+                size=size,
+                quality=quality,
+                n=1
+            )
         
         image_url = response.data[0].url
         logger.info(f"Image generated successfully: {image_url}")
@@ -1,7 +1,7 @@
 """
 Base database models - Simplified schema for v1.
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Enum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from aiwriter_backend.db.session import Base
@@ -83,6 +83,15 @@ class Job(Base):
     # Relationships
     site = relationship("Site", back_populates="jobs")
     articles = relationship("Article", back_populates="job")
+    
+    __table_args__ = (
+        Index(
+            "ix_jobs_pending_id",
+            id.desc(),
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+    )
 
 
 class ArticleStatus(enum.Enum):
@@ -123,6 +132,9 @@ class Article(Base):
 class Usage(Base):
     """Usage tracking model."""
     __tablename__ = "usage"
+    __table_args__ = (
+        Index("ix_usage_site_month", "site_id", "year_month", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     site_id = Column(Integer, ForeignKey("sites.id"), nullable=False)
@@ -0,0 +1,20 @@
+"""
+Helpers shared by Alembic migrations.
+"""
+from typing import Optional
+
+from alembic import op
+
+
+def set_safe_timeouts(lock_timeout: Optional[str] = "3s", statement_timeout: Optional[str] = "30min") -> None:
+    """Fail fast on lock contention instead of queueing behind a blocked ALTER TABLE.
+
+    Alembic runs all pending revisions on one connection, so both settings are
+    always emitted; passing None disables that timeout (0) rather than leaving
+    whatever an earlier revision set in place.
+    """
+    if op.get_context().dialect.name != "postgresql":
+        return
+
+    op.execute(f"SET lock_timeout = '{lock_timeout or 0}'")
+    op.execute(f"SET statement_timeout = '{statement_timeout or 0}'")
@@ -2,13 +2,30 @@
 Database session management.
 """
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from aiwriter_backend.core.config import settings
 
+database_url = make_url(settings.DATABASE_URL)
+
+# LIFO keeps reusing the most recently returned (warm) connection and lets
+# surplus connections idle out; pre-ping drops connections the server closed
+engine_options = {"pool_pre_ping": True}
+if database_url.get_backend_name() != "sqlite":
+    engine_options["pool_use_lifo"] = True
+
+if database_url.get_backend_name() == "postgresql" and database_url.get_driver_name() == "psycopg2":
+    # Batch executemany() (bulk inserts/updates, seeds, backfills) into few round-trips
+    engine_options.update(
+        executemany_mode="values_plus_batch",
+        executemany_batch_page_size=500,
+        insertmanyvalues_page_size=1000,
+    )
+
 # Create database engine
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(database_url, **engine_options)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -9,6 +9,7 @@ import asyncio
 import logging
 
 from aiwriter_backend.core.config import settings
+from aiwriter_backend.core.openai_client import close_openai
 from aiwriter_backend.db.init_db import init_db
 from aiwriter_backend.db.session import SessionLocal
 from aiwriter_backend.routers import license, jobs, webhook, scheduler
@@ -76,9 +77,10 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Shutdown scheduler on application shutdown."""
+    """Shutdown scheduler and OpenAI client on application shutdown."""
     job_scheduler.shutdown(wait=False)
     logger.info("APScheduler stopped")
+    await close_openai()
 
 @app.get("/")
 async def root():
@@ -35,7 +35,7 @@ def upgrade() -> None:
         sa.Column('plan_id', sa.Integer(), nullable=False),
         sa.Column('status', sa.String(), nullable=True),
         sa.Column('reset_day', sa.Integer(), nullable=True),
-        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
         sa.ForeignKeyConstraint(['plan_id'], ['plans.id'], ),
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('key')
@@ -49,7 +49,7 @@ def upgrade() -> None:
         sa.Column('license_id', sa.Integer(), nullable=False),
         sa.Column('domain', sa.String(), nullable=False),
         sa.Column('site_secret', sa.String(), nullable=False),
-        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
         sa.ForeignKeyConstraint(['license_id'], ['licenses.id'], ),
         sa.PrimaryKeyConstraint('id')
     )
@@ -64,7 +64,7 @@ def upgrade() -> None:
         sa.Column('images', sa.Boolean(), nullable=True),
         sa.Column('status', sa.String(), nullable=True),
         sa.Column('error', sa.Text(), nullable=True),
-        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
         sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
         sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ),
         sa.PrimaryKeyConstraint('id')
@@ -8,26 +8,118 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from aiwriter_backend.db.migration_utils import set_safe_timeouts
+
 # revision identifiers, used by Alembic.
 revision = '003_phase3_article_fields'
 down_revision = '002_add_callback_url'
 branch_labels = None
 depends_on = None
 
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _backfill_jobs_column(bind, column: str, value) -> None:
+    """Backfill NULLs in jobs.<column> in keyset-paginated batches."""
+    # One stable statement text so the server can reuse the plan across batches
+    stmt = sa.text(
+        f"UPDATE jobs SET {column} = :value "
+        f"WHERE id IN (SELECT id FROM jobs WHERE id > :last AND {column} IS NULL "
+        f"ORDER BY id LIMIT :bs) "
+        f"RETURNING id"
+    )
+    last = 0
+    while True:
+        ids = bind.execute(stmt, {"value": value, "last": last, "bs": BACKFILL_BATCH_SIZE}).scalars().all()
+        if not ids:
+            break
+        last = max(ids)
+
+
+ARTICLE_INDEXES = {
+    'ix_articles_job_id': ['job_id'],
+    'ix_articles_license_id': ['license_id'],
+    'ix_articles_created_at': ['created_at'],
+    'ix_articles_license_created': ['license_id', 'created_at'],
+}
+
+
+def _create_articles_table(status_type, image_urls_default) -> None:
+    """Create the articles table with dialect-specific enum type and JSON default."""
+    op.create_table(
+        'articles',
+        sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
+        sa.Column('job_id', sa.Integer(), sa.ForeignKey('jobs.id'), nullable=False),
+        sa.Column('license_id', sa.Integer(), sa.ForeignKey('licenses.id'), nullable=False),
+        sa.Column('topic', sa.Text(), nullable=False),
+        sa.Column('language', sa.String(), nullable=False, server_default='de'),
+        sa.Column('outline_json', sa.JSON(), nullable=True),
+        sa.Column('article_html', sa.Text(), nullable=True),
+        sa.Column('meta_title', sa.String(length=160), nullable=True),
+        sa.Column('meta_description', sa.String(length=180), nullable=True),
+        sa.Column('faq_json', sa.JSON(), nullable=True),
+        sa.Column('schema_json', sa.JSON(), nullable=True),
+        sa.Column('image_urls_json', sa.JSON(), nullable=True, server_default=image_urls_default),
+        sa.Column('tokens_input', sa.Integer(), nullable=True),
+        sa.Column('tokens_output', sa.Integer(), nullable=True),
+        sa.Column('image_cost_cents', sa.Integer(), nullable=True, server_default=sa.text("0")),
+        sa.Column('status', status_type, nullable=False, server_default='draft'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def _upgrade_sqlite(bind) -> None:
+    """SQLite path (used for local/test databases) via batch operations."""
+    insp = sa.inspect(bind)
+
+    if not insp.has_table('articles'):
+        _create_articles_table(
+            sa.Enum('draft', 'ready', 'failed', name='articlestatus'),
+            sa.text("'[]'"),
+        )
+
+    existing_indexes = {ix['name'] for ix in insp.get_indexes('articles')}
+    with op.batch_alter_table('articles') as batch_op:
+        for index_name, columns in ARTICLE_INDEXES.items():
+            if index_name not in existing_indexes:
+                batch_op.create_index(index_name, columns)
+
+    jobs_columns = {col['name'] for col in insp.get_columns('jobs')}
+    with op.batch_alter_table('jobs') as batch_op:
+        if 'requested_images' not in jobs_columns:
+            batch_op.add_column(sa.Column('requested_images', sa.Integer(), nullable=True))
+        if 'language' not in jobs_columns:
+            batch_op.add_column(sa.Column('language', sa.String(), nullable=True))
+
+    op.execute("UPDATE jobs SET requested_images = 0 WHERE requested_images IS NULL")
+    op.execute("UPDATE jobs SET language = 'de' WHERE language IS NULL")
+
 
 def upgrade() -> None:
     bind = op.get_bind()
-    insp = sa.inspect(bind)
 
-    # 0) Ensure the enum exists only once
-    op.execute("""
-    DO $$
-    BEGIN
-        IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'articlestatus') THEN
-            CREATE TYPE articlestatus AS ENUM ('draft', 'ready', 'failed');
-        END IF;
-    END$$;
-    """)
+    if op.get_context().dialect.name != 'postgresql':
+        _upgrade_sqlite(bind)
+        return
+
+    insp = sa.inspect(bind)
+    set_safe_timeouts()
+
+    # Prefetch existing indexes and jobs columns in one round-trip so the
+    # idempotent steps below can be skipped Python-side on migrated databases
+    existing = set(bind.execute(sa.text(
+        "SELECT 'idx:' || indexname FROM pg_indexes WHERE tablename IN ('articles', 'jobs') "
+        "UNION ALL "
+        "SELECT 'col:jobs.' || column_name FROM information_schema.columns WHERE table_name = 'jobs'"
+    )).scalars())
+
+    # 0) Ensure the enum exists only once (plain SQL check, no PL/pgSQL block)
+    enum_exists = bind.execute(
+        sa.text("SELECT 1 FROM pg_type WHERE typname = 'articlestatus'")
+    ).scalar()
+    if not enum_exists:
+        op.execute("CREATE TYPE articlestatus AS ENUM ('draft', 'ready', 'failed')")
 
     status_enum = postgresql.ENUM(
         'draft', 'ready', 'failed', name='articlestatus', create_type=False
@@ -35,42 +127,25 @@ def upgrade() -> None:
 
     # 1) Create articles table if missing; otherwise skip
     if not insp.has_table('articles'):
-        op.create_table(
-            'articles',
-            sa.Column('id', sa.Integer(), primary_key=True, nullable=False),
-            sa.Column('job_id', sa.Integer(), sa.ForeignKey('jobs.id'), nullable=False),
-            sa.Column('license_id', sa.Integer(), sa.ForeignKey('licenses.id'), nullable=False),
-            sa.Column('topic', sa.Text(), nullable=False),
-            sa.Column('language', sa.String(), nullable=False, server_default='de'),
-            sa.Column('outline_json', sa.JSON(), nullable=True),
-            sa.Column('article_html', sa.Text(), nullable=True),
-            sa.Column('meta_title', sa.String(length=160), nullable=True),
-            sa.Column('meta_description', sa.String(length=180), nullable=True),
-            sa.Column('faq_json', sa.JSON(), nullable=True),
-            sa.Column('schema_json', sa.JSON(), nullable=True),
-            sa.Column('image_urls_json', sa.JSON(), nullable=True, server_default=sa.text("'[]'::json")),
-            sa.Column('tokens_input', sa.Integer(), nullable=True),
-            sa.Column('tokens_output', sa.Integer(), nullable=True),
-            sa.Column('image_cost_cents', sa.Integer(), nullable=True, server_default=sa.text("0")),
-            sa.Column('status', status_enum, nullable=False, server_default='draft'),
-            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
-            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
-        )
+        _create_articles_table(status_enum, sa.text("'[]'::json"))
     # else: table exists; we won't try to recreate it
 
     # 2) Ensure indexes exist (Postgres supports IF NOT EXISTS)
-    op.execute("CREATE INDEX IF NOT EXISTS ix_articles_job_id ON articles (job_id)")
-    op.execute("CREATE INDEX IF NOT EXISTS ix_articles_license_id ON articles (license_id)")
-    op.execute("CREATE INDEX IF NOT EXISTS ix_articles_created_at ON articles (created_at)")
-    op.execute("CREATE INDEX IF NOT EXISTS ix_articles_license_created ON articles (license_id, created_at)")
+    for index_name, columns in ARTICLE_INDEXES.items():
+        if f'idx:{index_name}' not in existing:
+            op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON articles ({', '.join(columns)})")
 
     # 3) Update jobs table — add columns with safe defaults if missing, then backfill
-    op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS requested_images INTEGER")
-    op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS language VARCHAR")
-
-    # Set server defaults (only if they are currently NULL on existing rows)
-    op.execute("UPDATE jobs SET requested_images = 0 WHERE requested_images IS NULL")
-    op.execute("UPDATE jobs SET language = 'de' WHERE language IS NULL")
+    if 'col:jobs.requested_images' not in existing:
+        op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS requested_images INTEGER")
+    if 'col:jobs.language' not in existing:
+        op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS language VARCHAR")
+
+    # Set server defaults (only if they are currently NULL on existing rows).
+    # Each batch commits on its own so row locks are held briefly on large tables.
+    with op.get_context().autocommit_block():
+        _backfill_jobs_column(bind, "requested_images", 0)
+        _backfill_jobs_column(bind, "language", "de")
 
     # Optionally enforce not nulls & remove server defaults after backfill, if desired:
     # op.execute(\"ALTER TABLE jobs ALTER COLUMN requested_images SET NOT NULL\")
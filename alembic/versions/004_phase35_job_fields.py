@@ -8,6 +8,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from aiwriter_backend.db.migration_utils import set_safe_timeouts
+
 # revision identifiers, used by Alembic.
 revision = '004_phase35_job_fields'
 down_revision = '003_phase3_article_fields'
@@ -16,12 +18,14 @@ depends_on = None
 
 
 def upgrade() -> None:
+    set_safe_timeouts()
+
     # Add Phase 3.5 fields to jobs table
     # Use nullable columns with application-level defaults to avoid table rewrite
     op.add_column('jobs', sa.Column('context', sa.Text(), nullable=True))
     op.add_column('jobs', sa.Column('user_images', postgresql.JSON(astext_type=sa.Text()), nullable=True))
-    op.add_column('jobs', sa.Column('include_faq', sa.Boolean(), nullable=True, server_default=sa.text('true')))
-    op.add_column('jobs', sa.Column('include_cta', sa.Boolean(), nullable=True, server_default=sa.text('false')))
+    op.add_column('jobs', sa.Column('include_faq', sa.Boolean(), nullable=True, server_default=sa.true()))
+    op.add_column('jobs', sa.Column('include_cta', sa.Boolean(), nullable=True, server_default=sa.false()))
     op.add_column('jobs', sa.Column('cta_url', sa.String(), nullable=True))
     op.add_column('jobs', sa.Column('template', sa.String(), nullable=True, server_default='classic'))
     op.add_column('jobs', sa.Column('style_preset', sa.String(), nullable=True, server_default='default'))
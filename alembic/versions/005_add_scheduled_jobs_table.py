@@ -8,6 +8,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
+from aiwriter_backend.db.migration_utils import set_safe_timeouts
+
 # revision identifiers, used by Alembic.
 revision = '005_add_scheduled_jobs_table'
 down_revision = '004_phase35_job_fields'
@@ -16,7 +18,11 @@ depends_on = None
 
 
 def upgrade() -> None:
-    # Create scheduled_jobs table
+    set_safe_timeouts()
+
+    # Create scheduled_jobs table. The foreign keys are declared inline so they
+    # are emitted as part of the single CREATE TABLE statement (no follow-up
+    # ALTER TABLE per constraint, and nothing to validate on an empty table).
     op.create_table(
         'scheduled_jobs',
         sa.Column('id', sa.Integer(), nullable=False),
@@ -34,8 +40,8 @@ def upgrade() -> None:
         sa.Column('job_id', sa.Integer(), nullable=True),
         sa.Column('article_id', sa.Integer(), nullable=True),
         sa.Column('wordpress_post_id', sa.Integer(), nullable=True),
-        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
-        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
         sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ),
         sa.ForeignKeyConstraint(['license_id'], ['licenses.id'], ),
         sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
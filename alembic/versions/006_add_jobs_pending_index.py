@@ -0,0 +1,40 @@
+"""Add partial index for pending jobs
+
+Revision ID: 006_add_jobs_pending_index
+Revises: 005_add_scheduled_jobs_table
+Create Date: 2026-10-16 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from aiwriter_backend.db.migration_utils import set_safe_timeouts
+
+# revision identifiers, used by Alembic.
+revision = '006_add_jobs_pending_index'
+down_revision = '005_add_scheduled_jobs_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY waits on other transactions by design, so clear
+    # any lock_timeout left by earlier revisions and only bound the runtime
+    set_safe_timeouts(lock_timeout=None)
+
+    # Partial index only covers pending rows, so "latest pending job" lookups
+    # stay a short backward index scan regardless of jobs table size
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_jobs_pending_id',
+            'jobs',
+            [sa.text('id DESC')],
+            unique=False,
+            postgresql_where=sa.text("status = 'pending'"),
+            sqlite_where=sa.text("status = 'pending'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_jobs_pending_id', table_name='jobs', postgresql_concurrently=True)
@@ -0,0 +1,42 @@
+"""Add unique index on usage (site_id, year_month)
+
+Revision ID: 007_add_usage_site_month_unique
+Revises: 006_add_jobs_pending_index
+Create Date: 2026-10-16 11:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from aiwriter_backend.db.migration_utils import set_safe_timeouts
+
+# revision identifiers, used by Alembic.
+revision = '007_add_usage_site_month_unique'
+down_revision = '006_add_jobs_pending_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    set_safe_timeouts()
+
+    # Fold any duplicate monthly rows into the oldest one before enforcing uniqueness
+    op.execute("""
+        UPDATE usage SET articles_generated = (
+            SELECT SUM(COALESCE(u2.articles_generated, 0)) FROM usage u2
+            WHERE u2.site_id = usage.site_id AND u2.year_month = usage.year_month
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM usage GROUP BY site_id, year_month HAVING COUNT(*) > 1
+        )
+    """)
+    op.execute("""
+        DELETE FROM usage
+        WHERE id NOT IN (SELECT MIN(id) FROM usage GROUP BY site_id, year_month)
+    """)
+
+    # Enables INSERT ... ON CONFLICT (site_id, year_month) for usage counters
+    op.create_index('ix_usage_site_month', 'usage', ['site_id', 'year_month'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_usage_site_month', table_name='usage')
@@ -17,8 +17,8 @@ def check_locks():
                 blocking_locks.pid AS blocking_pid,
                 blocked_activity.usename AS blocked_user,
                 blocking_activity.usename AS blocking_user,
-                blocked_activity.query AS blocked_statement,
-                blocking_activity.query AS blocking_statement
+                LEFT(blocked_activity.query, 200) AS blocked_statement,
+                LEFT(blocking_activity.query, 200) AS blocking_statement
             FROM pg_catalog.pg_locks blocked_locks
             JOIN pg_catalog.pg_stat_activity blocked_activity ON blocked_activity.pid = blocked_locks.pid
             JOIN pg_catalog.pg_locks blocking_locks 
@@ -35,19 +35,26 @@ def check_locks():
                 AND blocking_locks.pid != blocked_locks.pid
             JOIN pg_catalog.pg_stat_activity blocking_activity ON blocking_activity.pid = blocking_locks.pid
             WHERE NOT blocked_locks.granted
-        """))
+        """).execution_options(stream_results=True, yield_per=100))
         
-        blocks = list(result)
-        if blocks:
-            print("🚨 BLOCKING QUERIES DETECTED:")
-            for row in blocks:
-                print(f"\nBlocked PID: {row[0]}")
-                print(f"Blocking PID: {row[1]}")
-                print(f"Blocked Query: {row[4][:200]}...")
-                print(f"Blocking Query: {row[5][:200]}...")
-        else:
+        # Stream rows instead of materializing the whole result set
+        found = False
+        for row in result:
+            if not found:
+                print("🚨 BLOCKING QUERIES DETECTED:")
+                found = True
+            print(f"\nBlocked PID: {row[0]}")
+            print(f"Blocking PID: {row[1]}")
+            print(f"Blocked Query: {row[4]}...")
+            print(f"Blocking Query: {row[5]}...")
+        if not found:
             print("✅ No blocking queries detected")
         
+        # Resolve the job-related relation OIDs once so the lock scan is a plain OID match
+        oids = conn.execute(text(
+            "SELECT oid FROM pg_class WHERE relname IN ('jobs', 'articles', 'scheduled_jobs')"
+        )).scalars().all()
+        
         # Check for locks on jobs table
         result = conn.execute(text("""
             SELECT 
@@ -56,22 +63,22 @@ def check_locks():
                 l.mode,
                 l.granted,
                 a.usename,
-                a.query,
+                LEFT(a.query, 100) AS query,
                 a.query_start
             FROM pg_locks l
             JOIN pg_stat_activity a ON l.pid = a.pid
-            WHERE l.relation = 'jobs'::regclass::oid
-               OR l.relation::text LIKE '%jobs%'
+            WHERE l.relation = ANY(:oids)
             ORDER BY a.query_start
-        """))
+        """).execution_options(stream_results=True, yield_per=100), {"oids": list(oids)})
         
-        locks = list(result)
-        if locks:
-            print("\n🔒 LOCKS ON JOBS TABLE:")
-            for row in locks:
-                granted = "✅ GRANTED" if row[3] else "⏳ WAITING"
-                print(f"{granted} - {row[4]} - {row[5][:100]}...")
-        else:
+        found = False
+        for row in result:
+            if not found:
+                print("\n🔒 LOCKS ON JOBS TABLE:")
+                found = True
+            granted = "✅ GRANTED" if row[3] else "⏳ WAITING"
+            print(f"{granted} - {row[4]} - {row[5]}...")
+        if not found:
             print("\n✅ No locks on jobs table")
 
 if __name__ == '__main__':
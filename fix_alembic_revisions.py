@@ -44,11 +44,12 @@ def fix_alembic_revisions():
         
         print(f"\n📌 Setting Alembic version to: {correct_version}")
         
-        # Delete all existing entries
-        conn.execute(text("DELETE FROM alembic_version"))
-        
-        # Insert the correct version
-        conn.execute(text("INSERT INTO alembic_version (version_num) VALUES (:version)"), {"version": correct_version})
+        # Replace all existing entries with the correct version in one round-trip.
+        # The SELECT above already began the transaction, so commit() keeps it atomic.
+        conn.execute(
+            text("TRUNCATE alembic_version; INSERT INTO alembic_version (version_num) VALUES (:version)"),
+            {"version": correct_version}
+        )
         conn.commit()
         
         print(f"✅ Fixed! Alembic version is now: {correct_version}")
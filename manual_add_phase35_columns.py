@@ -1,56 +1,44 @@
 #!/usr/bin/env python3
 """
-Manually add Phase 3.5 columns directly to jobs table without Alembic transaction overhead.
-This can be faster if there are lock issues.
+Manually add Phase 3.5 columns directly to jobs table without going through Alembic.
+The whole change is sent as one batch in a single transaction, which keeps lock time short.
 """
 import sys
-from sqlalchemy import create_engine, text
-from aiwriter_backend.core.config import settings
+from aiwriter_backend.db.session import engine
 
 def manual_add_columns():
     """Add Phase 3.5 columns directly using raw SQL."""
-    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+    # All columns are added in one multi-clause ALTER TABLE (one lock acquisition);
+    # IF NOT EXISTS makes each clause idempotent, so no pre-check query is needed
+    columns_to_add = {
+        'context': "ADD COLUMN IF NOT EXISTS context TEXT",
+        'user_images': "ADD COLUMN IF NOT EXISTS user_images JSONB",
+        'include_faq': "ADD COLUMN IF NOT EXISTS include_faq BOOLEAN DEFAULT true",
+        'include_cta': "ADD COLUMN IF NOT EXISTS include_cta BOOLEAN DEFAULT false",
+        'cta_url': "ADD COLUMN IF NOT EXISTS cta_url VARCHAR",
+        'template': "ADD COLUMN IF NOT EXISTS template VARCHAR DEFAULT 'classic'",
+        'style_preset': "ADD COLUMN IF NOT EXISTS style_preset VARCHAR DEFAULT 'default'"
+    }
     
     try:
-        with engine.connect() as conn:
-            print("Checking current columns...")
-            result = conn.execute(text("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'jobs' 
-                AND column_name IN ('context', 'user_images', 'include_faq', 'include_cta', 'cta_url', 'template', 'style_preset')
-            """))
-            existing = [row[0] for row in result]
+        # Reuse the shared engine; one explicit transaction so a failure rolls
+        # back the schema change and the version bump together
+        with engine.begin() as conn:
+            print(f"Adding columns: {', '.join(columns_to_add)}...")
             
-            if existing:
-                print(f"⚠️  Some columns already exist: {existing}")
-                print("Skipping existing columns...")
+            # Schema change and Alembic version bump go out as a single batch
+            conn.exec_driver_sql(
+                "ALTER TABLE jobs " + ", ".join(columns_to_add.values()) + "; "
+                "DELETE FROM alembic_version WHERE version_num <> '004_phase35_job_fields'; "
+                "INSERT INTO alembic_version (version_num) VALUES ('004_phase35_job_fields') "
+                "ON CONFLICT (version_num) DO NOTHING"
+            )
             
-            # Add columns one by one (faster, can be interrupted)
-            columns_to_add = {
-                'context': "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS context TEXT",
-                'user_images': "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS user_images JSONB",
-                'include_faq': "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS include_faq BOOLEAN DEFAULT true",
-                'include_cta': "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS include_cta BOOLEAN DEFAULT false",
-                'cta_url': "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS cta_url VARCHAR",
-                'template': "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS template VARCHAR DEFAULT 'classic'",
-                'style_preset': "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS style_preset VARCHAR DEFAULT 'default'"
-            }
-            
-            for col_name, sql in columns_to_add.items():
-                if col_name not in existing:
-                    print(f"Adding column: {col_name}...")
-                    conn.execute(text(sql))
-                    print(f"✅ Added {col_name}")
-                else:
-                    print(f"⏭️  Skipped {col_name} (already exists)")
+            # Columns that already existed are reported by PostgreSQL as NOTICEs
+            for notice in getattr(conn.connection.dbapi_connection, "notices", []):
+                print(f"⏭️  {notice.strip()}")
             
             print("\n✅ All columns added!")
-            
-            # Update Alembic version
-            print("\nUpdating Alembic version...")
-            conn.execute(text("DELETE FROM alembic_version"))
-            conn.execute(text("INSERT INTO alembic_version (version_num) VALUES ('004_phase35_job_fields')"))
             print("✅ Alembic version updated to: 004_phase35_job_fields")
             
             return True
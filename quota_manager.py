@@ -5,48 +5,53 @@ Quota Management Script for AIWriter
 import sys
 import os
 from datetime import datetime
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 # Add the backend directory to Python path
 sys.path.append('/home/rei/apps/aiwriter-backend')
 
-from aiwriter_backend.db.session import get_db
+from aiwriter_backend.db.session import SessionLocal
 from aiwriter_backend.db.base import Site, License, Plan, Usage
 
-def show_usage():
+# Usage month key (YYYY-MM), computed once per run; local time to match JobService
+CURRENT_MONTH = datetime.now().strftime("%Y-%m")
+
+def show_usage(db: Session):
     """Show current usage for all sites."""
-    db = next(get_db())
-    
-    current_month = f"{datetime.now().year}-{datetime.now().month:02d}"
-    
-    sites = db.query(Site).all()
+    # Single query: Site -> License -> Plan, plus this month's Usage if any.
+    # Only the printed columns are selected, no ORM objects are built.
+    rows = db.execute(
+        select(
+            Site.id,
+            Site.domain,
+            Plan.name,
+            Plan.monthly_limit,
+            func.coalesce(Usage.articles_generated, 0)
+        ).select_from(Site).join(
+            License, License.id == Site.license_id
+        ).join(
+            Plan, Plan.id == License.plan_id
+        ).outerjoin(
+            Usage, and_(Usage.site_id == Site.id, Usage.year_month == CURRENT_MONTH)
+        )
+    ).all()
     
-    print(f"=== Usage Report for {current_month} ===")
+    print(f"=== Usage Report for {CURRENT_MONTH} ===")
     print(f"{'Site ID':<8} {'Domain':<30} {'Plan':<10} {'Used':<6} {'Limit':<6} {'Remaining':<10}")
     print("-" * 80)
     
-    for site in sites:
-        license_obj = db.query(License).filter(License.id == site.license_id).first()
-        plan = db.query(Plan).filter(Plan.id == license_obj.plan_id).first()
-        
-        usage = db.query(Usage).filter(
-            Usage.site_id == site.id,
-            Usage.year_month == current_month
-        ).first()
+    for site_id, domain, plan_name, monthly_limit, used in rows:
+        remaining = monthly_limit - used
         
-        used = usage.articles_generated if usage else 0
-        remaining = plan.monthly_limit - used
-        
-        print(f"{site.id:<8} {site.domain:<30} {plan.name:<10} {used:<6} {plan.monthly_limit:<6} {remaining:<10}")
+        print(f"{site_id:<8} {domain:<30} {plan_name:<10} {used:<6} {monthly_limit:<6} {remaining:<10}")
 
-def reset_site_usage(site_id: int):
+def reset_site_usage(db: Session, site_id: int):
     """Reset usage for a specific site."""
-    db = next(get_db())
-    current_month = f"{datetime.now().year}-{datetime.now().month:02d}"
-    
     usage = db.query(Usage).filter(
         Usage.site_id == site_id,
-        Usage.year_month == current_month
+        Usage.year_month == CURRENT_MONTH
     ).first()
     
     if usage:
@@ -57,10 +62,8 @@ def reset_site_usage(site_id: int):
     
     db.commit()
 
-def increase_plan_limit(plan_id: int, new_limit: int):
+def increase_plan_limit(db: Session, plan_id: int, new_limit: int):
     """Increase monthly limit for a plan."""
-    db = next(get_db())
-    
     plan = db.query(Plan).filter(Plan.id == plan_id).first()
     if plan:
         old_limit = plan.monthly_limit
@@ -70,42 +73,35 @@ def increase_plan_limit(plan_id: int, new_limit: int):
     else:
         print(f"Plan {plan_id} not found")
 
-def add_usage(site_id: int, articles: int):
+def add_usage(db: Session, site_id: int, articles: int):
     """Add articles to usage (for testing)."""
-    db = next(get_db())
-    current_month = f"{datetime.now().year}-{datetime.now().month:02d}"
-    
-    usage = db.query(Usage).filter(
-        Usage.site_id == site_id,
-        Usage.year_month == current_month
-    ).first()
-    
-    if usage:
-        usage.articles_generated += articles
-    else:
-        usage = Usage(
-            site_id=site_id,
-            year_month=current_month,
-            articles_generated=articles
-        )
-        db.add(usage)
+    # Atomic upsert on the (site_id, year_month) unique index
+    stmt = pg_insert(Usage).values(
+        site_id=site_id,
+        year_month=CURRENT_MONTH,
+        articles_generated=articles
+    ).on_conflict_do_update(
+        index_elements=['site_id', 'year_month'],
+        set_={'articles_generated': Usage.__table__.c.articles_generated + articles}
+    )
+    db.execute(stmt)
     
     db.commit()
     print(f"Added {articles} articles to site {site_id} usage")
 
-def show_plans():
+def show_plans(db: Session):
     """Show all available plans."""
-    db = next(get_db())
-    
-    plans = db.query(Plan).all()
+    plans = db.execute(
+        select(Plan.id, Plan.name, Plan.monthly_limit, Plan.max_images_per_article, Plan.price_eur)
+    ).all()
     
     print("=== Available Plans ===")
     print(f"{'Plan ID':<8} {'Name':<10} {'Monthly Limit':<13} {'Max Images':<11} {'Price (EUR)':<12}")
     print("-" * 60)
     
-    for plan in plans:
-        price_eur = plan.price_eur / 100 if plan.price_eur else 0
-        print(f"{plan.id:<8} {plan.name:<10} {plan.monthly_limit:<13} {plan.max_images_per_article:<11} {price_eur:<12}")
+    for plan_id, name, monthly_limit, max_images, price_cents in plans:
+        price_eur = price_cents / 100 if price_cents else 0
+        print(f"{plan_id:<8} {name:<10} {monthly_limit:<13} {max_images:<11} {price_eur:<12}")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -127,24 +123,26 @@ if __name__ == "__main__":
     command = sys.argv[1]
     
     try:
-        if command == "show":
-            show_usage()
-        elif command == "plans":
-            show_plans()
-        elif command == "reset" and len(sys.argv) == 3:
-            site_id = int(sys.argv[2])
-            reset_site_usage(site_id)
-        elif command == "increase" and len(sys.argv) == 4:
-            plan_id = int(sys.argv[2])
-            new_limit = int(sys.argv[3])
-            increase_plan_limit(plan_id, new_limit)
-        elif command == "add" and len(sys.argv) == 4:
-            site_id = int(sys.argv[2])
-            articles = int(sys.argv[3])
-            add_usage(site_id, articles)
-        else:
-            print("Invalid command or arguments")
-            print("Use 'python quota_manager.py' without arguments to see usage")
+        # One session for the whole run, released deterministically on exit
+        with SessionLocal() as db:
+            if command == "show":
+                show_usage(db)
+            elif command == "plans":
+                show_plans(db)
+            elif command == "reset" and len(sys.argv) == 3:
+                site_id = int(sys.argv[2])
+                reset_site_usage(db, site_id)
+            elif command == "increase" and len(sys.argv) == 4:
+                plan_id = int(sys.argv[2])
+                new_limit = int(sys.argv[3])
+                increase_plan_limit(db, plan_id, new_limit)
+            elif command == "add" and len(sys.argv) == 4:
+                site_id = int(sys.argv[2])
+                articles = int(sys.argv[3])
+                add_usage(db, site_id, articles)
+            else:
+                print("Invalid command or arguments")
+                print("Use 'python quota_manager.py' without arguments to see usage")
     except Exception as e:
         print(f"Error: {e}")
         import traceback
@@ -1,7 +1,7 @@
 """
 Script to create an admin user.
 """
-import asyncio
+from sqlalchemy import exists
 from sqlalchemy.orm import Session
 from aiwriter_backend.db.session import SessionLocal
 from aiwriter_backend.db.base import User
@@ -12,8 +12,7 @@ def create_admin_user(email: str):
     db = SessionLocal()
     try:
         # Check if user already exists
-        existing_user = db.query(User).filter(User.email == email).first()
-        if existing_user:
+        if db.query(exists().where(User.email == email)).scalar():
             print(f"User with email {email} already exists")
             return
         
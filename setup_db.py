@@ -3,7 +3,7 @@ Database setup script - creates tables and seeds initial data.
 """
 import os
 import sys
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exists
 from sqlalchemy.orm import sessionmaker
 
 # Add the current directory to Python path
@@ -25,37 +25,34 @@ def seed_plans():
     """Seed the database with subscription plans."""
     db = SessionLocal()
     try:
-        # Check if plans already exist
-        existing_plans = db.query(Plan).count()
-        if existing_plans > 0:
+        # Check if plans already exist (EXISTS stops at the first row)
+        if db.query(exists().select_from(Plan)).scalar():
             print("Plans already exist, skipping seed")
             return
         
-        # Create plans
+        # Create plans in a single bulk INSERT
         plans = [
-            Plan(
-                name="Free",
-                monthly_limit=10,
-                max_images_per_article=0,
-                price_eur=0
-            ),
-            Plan(
-                name="Starter",
-                monthly_limit=30,
-                max_images_per_article=1,
-                price_eur=1900  # €19.00 in cents
-            ),
-            Plan(
-                name="Pro",
-                monthly_limit=100,
-                max_images_per_article=2,
-                price_eur=4900  # €49.00 in cents
-            )
+            {
+                "name": "Free",
+                "monthly_limit": 10,
+                "max_images_per_article": 0,
+                "price_eur": 0
+            },
+            {
+                "name": "Starter",
+                "monthly_limit": 30,
+                "max_images_per_article": 1,
+                "price_eur": 1900  # €19.00 in cents
+            },
+            {
+                "name": "Pro",
+                "monthly_limit": 100,
+                "max_images_per_article": 2,
+                "price_eur": 4900  # €49.00 in cents
+            }
         ]
         
-        for plan in plans:
-            db.add(plan)
-        
+        db.bulk_insert_mappings(Plan, plans)
         db.commit()
         print("Plans seeded successfully")
         
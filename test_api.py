@@ -1,37 +1,82 @@
 """
 Test script for API endpoints.
 """
+import atexit
 import requests
 import json
 import secrets
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 from aiwriter_backend.db.session import SessionLocal
-from aiwriter_backend.db.base import License, Plan
+from aiwriter_backend.db.base import Article, Job, License, Plan, Site, Usage
 
 # API base URL
 API_BASE = "http://localhost:8000"
 
-def create_test_license():
-    """Create a test license in the database."""
+# Shared HTTP session so all tests reuse one keep-alive connection pool
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+SESSION.headers.update({"Content-Type": "application/json"})
+
+# IDs of licenses created by this run, removed again on exit
+CREATED_LICENSE_IDS = []
+
+@atexit.register
+def cleanup_test_licenses():
+    """Delete test licenses and the rows hanging off them in a few bulk DELETEs."""
+    if not CREATED_LICENSE_IDS:
+        return
+    
     db = SessionLocal()
     try:
-        # Get the Free plan
-        plan = db.query(Plan).filter(Plan.name == "Free").first()
-        if not plan:
-            print("No Free plan found. Please run seed_plans.py first.")
-            return None
+        site_ids = select(Site.id).where(Site.license_id.in_(CREATED_LICENSE_IDS))
+        job_ids = select(Job.id).where(Job.site_id.in_(site_ids))
         
+        db.execute(delete(Article).where(Article.job_id.in_(job_ids)))
+        db.execute(delete(Job).where(Job.site_id.in_(site_ids)))
+        db.execute(delete(Usage).where(Usage.site_id.in_(site_ids)))
+        db.execute(delete(Site).where(Site.license_id.in_(CREATED_LICENSE_IDS)))
+        db.execute(delete(License).where(License.id.in_(CREATED_LICENSE_IDS)))
+        db.commit()
+        
+        print(f"Cleaned up test licenses: {CREATED_LICENSE_IDS}")
+        
+    finally:
+        db.close()
+
+@lru_cache(maxsize=None)
+def free_plan_id():
+    """Look up the Free plan id once per run."""
+    db = SessionLocal()
+    try:
+        return db.query(Plan.id).filter(Plan.name == "Free").scalar()
+    finally:
+        db.close()
+
+@lru_cache(maxsize=1)
+def create_test_license():
+    """Create a test license in the database (once per run, shared by all tests)."""
+    # Get the Free plan
+    plan_id = free_plan_id()
+    if not plan_id:
+        print("No Free plan found. Please run seed_plans.py first.")
+        return None
+    
+    db = SessionLocal()
+    try:
         # Create a test license
         license_key = f"TEST-{secrets.token_hex(8).upper()}"
         license_obj = License(
             key=license_key,
-            plan_id=plan.id,
+            plan_id=plan_id,
             status="active"
         )
         
         db.add(license_obj)
         db.commit()
-        db.refresh(license_obj)
+        CREATED_LICENSE_IDS.append(license_obj.id)
         
         print(f"Created test license: {license_key}")
         return license_key
@@ -56,7 +101,7 @@ def test_license_activation():
     }
     
     try:
-        response = requests.post(url, json=data)
+        response = SESSION.post(url, json=data)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.json()}")
         
@@ -90,7 +135,7 @@ def test_license_validation():
     }
     
     try:
-        response = requests.post(url, json=data)
+        response = SESSION.post(url, json=data)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.json()}")
         
@@ -119,12 +164,11 @@ def test_job_creation(site_id, secret):
     
     headers = {
         "X-Site-ID": str(site_id),
-        "X-Signature": "test-signature",  # In real implementation, this would be HMAC
-        "Content-Type": "application/json"
+        "X-Signature": "test-signature"  # In real implementation, this would be HMAC
     }
     
     try:
-        response = requests.post(url, json=data, headers=headers)
+        response = SESSION.post(url, json=data, headers=headers)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.json()}")
         
@@ -132,6 +176,7 @@ def test_job_creation(site_id, secret):
             result = response.json()
             if result["success"]:
                 print(f"SUCCESS: Job created! Job ID: {result['job_id']}")
+                return True
             else:
                 print(f"FAILED: Job creation failed: {result['message']}")
         else:
@@ -139,13 +184,15 @@ def test_job_creation(site_id, secret):
             
     except Exception as e:
         print(f"ERROR: Request failed: {e}")
+    
+    return False
 
 def test_health_check():
     """Test health check endpoint."""
     print("\n=== Testing Health Check ===")
     
     try:
-        response = requests.get(f"{API_BASE}/health")
+        response = SESSION.get(f"{API_BASE}/health")
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.json()}")
         
@@ -172,8 +219,11 @@ def main():
     site_id, secret = test_license_activation()
     
     # Test job creation if activation succeeded
-    if site_id and secret:
-        test_job_creation(site_id, secret)
+    if site_id and secret and test_job_creation(site_id, secret):
+        # The server is now generating an article for this license in the
+        # background; deleting its rows on exit would race that task, so keep them
+        print(f"Keeping test licenses {CREATED_LICENSE_IDS}: a server-side job still uses them")
+        CREATED_LICENSE_IDS.clear()
     
     print("\n" + "=" * 50)
     print("SUCCESS: API Tests Completed!")
@@ -71,11 +71,14 @@ async def main():
     print(f"✅ OPENAI_API_KEY is set")
     print(f"Model: {os.getenv('OPENAI_TEXT_MODEL', 'gpt-5')}")
     
-    # Test basic GPT-5
-    basic_test = await test_gpt5()
-    
-    # Test GPT-5 reasoning
-    reasoning_test = await test_gpt5_reasoning()
+    # Run basic and reasoning tests concurrently; they are independent requests
+    basic_test, reasoning_test = await asyncio.gather(
+        test_gpt5(),
+        test_gpt5_reasoning(),
+        return_exceptions=True
+    )
+    basic_test = basic_test is True
+    reasoning_test = reasoning_test is True
     
     print("\n=== Results ===")
     print(f"GPT-5 Basic: {'✅ PASS' if basic_test else '❌ FAIL'}")
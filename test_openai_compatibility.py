@@ -2,12 +2,33 @@
 """
 Test OpenAI client compatibility on VPS.
 """
+import inspect
 import os
 import sys
 
 # Add the backend directory to Python path
 sys.path.append('/home/rei/apps/aiwriter-backend')
 
+# Cached OpenAI client, built once on first use
+_CLIENT = None
+
+def get_client(api_key: str):
+    """Return the cached OpenAI client, probing SDK capabilities once."""
+    global _CLIENT
+    
+    if _CLIENT is None:
+        from openai import OpenAI
+        
+        if "timeout" in inspect.signature(OpenAI).parameters:
+            _CLIENT = OpenAI(api_key=api_key, timeout=60)
+            print("✅ OpenAI client with timeout parameter works")
+        else:
+            print("⚠️ Timeout parameter not supported, trying without...")
+            _CLIENT = OpenAI(api_key=api_key)
+            print("✅ OpenAI client without timeout parameter works")
+    
+    return _CLIENT
+
 def test_openai_client():
     """Test OpenAI client initialization."""
     print("=== OpenAI Client Compatibility Test ===")
@@ -26,16 +47,7 @@ def test_openai_client():
         print(f"✅ OpenAI import successful")
         
         # Test client initialization
-        try:
-            client = OpenAI(api_key=api_key, timeout=60)
-            print("✅ OpenAI client with timeout parameter works")
-        except TypeError as e:
-            if "unexpected keyword argument" in str(e):
-                print("⚠️ Timeout parameter not supported, trying without...")
-                client = OpenAI(api_key=api_key)
-                print("✅ OpenAI client without timeout parameter works")
-            else:
-                raise
+        client = get_client(api_key)
         
         # Test API call
         print("Testing API call...")
@@ -64,11 +64,14 @@ async def main():
     print(f"Model: {os.getenv('OPENAI_TEXT_MODEL', 'gpt-4o')}")
     print(f"Image Model: {os.getenv('OPENAI_IMAGE_MODEL', 'dall-e-3')}")
     
-    # Test text generation
-    text_test = await test_openai_params()
-    
-    # Test image generation
-    image_test = await test_image_generation()
+    # Run text and image generation tests concurrently; they are independent requests
+    text_test, image_test = await asyncio.gather(
+        test_openai_params(),
+        test_image_generation(),
+        return_exceptions=True
+    )
+    text_test = text_test is True
+    image_test = image_test is True
     
     print("\n=== Results ===")
     print(f"Text Generation: {'✅ PASS' if text_test else '❌ FAIL'}")
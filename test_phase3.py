@@ -3,37 +3,125 @@
 Test script for Phase 3 AI Pipeline.
 """
 import asyncio
+import hashlib
+import json
 import os
 import sys
-from sqlalchemy.orm import Session
+import time
+from pathlib import Path
 
 # Add the backend directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from aiwriter_backend.db.session import get_db
-from aiwriter_backend.services.article_generator import ArticleGenerator
 from aiwriter_backend.core.config import settings
 
+# PYTEST_OFFLINE=1 serves OpenAI calls from canned responses, with no network or tokens
+OFFLINE = os.getenv("PYTEST_OFFLINE") == "1"
+
+CANNED_COMPLETION = {
+    "id": "chatcmpl-offline",
+    "object": "chat.completion",
+    "created": 0,
+    "model": settings.OPENAI_TEXT_MODEL,
+    "choices": [{
+        "index": 0,
+        "message": {"role": "assistant", "content": "AI is the field of building systems that learn from data."},
+        "finish_reason": "stop"
+    }],
+    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+}
+CANNED_IMAGE = {"created": 0, "data": [{"url": "https://example.com/offline-test-image.png"}]}
+
+def install_offline_client():
+    """Swap the OpenAI singleton for one whose transport answers with the canned payloads."""
+    import httpx
+    from openai import AsyncOpenAI
+    from aiwriter_backend.core import openai_client
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/chat/completions"):
+            return httpx.Response(200, json=CANNED_COMPLETION)
+        if request.url.path.endswith("/images/generations"):
+            return httpx.Response(200, json=CANNED_IMAGE)
+        return httpx.Response(404, json={"error": {"message": f"No offline fixture for {request.url.path}"}})
+    
+    openai_client._openai_client = AsyncOpenAI(
+        api_key="offline",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+# On-disk memos of OpenAI test responses; delete a file to force a live call
+IMAGE_CACHE_PATH = Path(__file__).with_name(".phase3_image_cache.json")
+TEXT_CACHE_PATH = Path(__file__).with_name(".phase3_text_cache.json")
+
+# OpenAI image URLs are short-lived signed links, so image entries expire
+IMAGE_CACHE_TTL_S = 30 * 60
+
+async def _memoized(path: Path, key_source: str, produce, ttl_s: float = None):
+    """Return the cached value for key_source from path, awaiting produce() on a miss.
+    
+    Entries older than ttl_s are refetched; empty results are never stored.
+    """
+    key = hashlib.sha256(key_source.encode()).hexdigest()
+    try:
+        cache = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        cache = {}
+    
+    entry = cache.get(key)
+    if isinstance(entry, dict) and entry.get("value"):
+        if ttl_s is None or time.time() - entry.get("stored_at", 0) < ttl_s:
+            print(f"Using cached response from {path.name}")
+            return entry["value"]
+    
+    value = await produce()
+    if value:
+        cache[key] = {"value": value, "stored_at": time.time()}
+        path.write_text(json.dumps(cache))
+    return value
+
+async def cached_gen_image(prompt: str) -> str:
+    """Generate an image URL, reusing a cached one for the same model and prompt."""
+    from aiwriter_backend.core.openai_client import gen_image
+    
+    return await _memoized(
+        IMAGE_CACHE_PATH,
+        settings.OPENAI_IMAGE_MODEL + prompt,
+        lambda: gen_image(prompt),
+        ttl_s=IMAGE_CACHE_TTL_S
+    )
+
+async def cached_run_text(messages: list) -> str:
+    """Generate text, reusing a cached completion for the same model and messages."""
+    from aiwriter_backend.core.openai_client import run_text
+    
+    return await _memoized(
+        TEXT_CACHE_PATH,
+        settings.OPENAI_TEXT_MODEL + json.dumps(messages, sort_keys=True),
+        lambda: run_text(messages)
+    )
+
 async def test_openai_client():
     """Test OpenAI client functionality."""
     print("=== Testing OpenAI Client ===")
     
     try:
-        from aiwriter_backend.core.openai_client import get_openai, run_text, gen_image
+        from aiwriter_backend.core.openai_client import gen_image, run_text
         
-        # Test text generation
-        print("Testing text generation...")
+        # Test text and image generation; the calls are independent, so overlap them
+        print("Testing text and image generation...")
         messages = [
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": "Write a short paragraph about AI."}
         ]
         
-        response = await run_text(messages)
+        # Offline runs go straight to the mocked client so canned data never lands in the caches
+        text_call, image_call = (run_text, gen_image) if OFFLINE else (cached_run_text, cached_gen_image)
+        response, image_url = await asyncio.gather(
+            text_call(messages),
+            image_call("A simple test image")
+        )
         print(f"Text response: {response[:100]}...")
-        
-        # Test image generation
-        print("Testing image generation...")
-        image_url = await gen_image("A simple test image")
         print(f"Image URL: {image_url}")
         
         print("✅ OpenAI client tests passed!")
@@ -47,65 +135,83 @@ async def test_article_generator():
     """Test article generator with a mock job."""
     print("\n=== Testing Article Generator ===")
     
+    if OFFLINE:
+        print("⏭️ Skipped in offline mode (needs live structured generation)")
+        return None
+    
+    from sqlalchemy import delete, func, insert, select
+    from aiwriter_backend.db.session import SessionLocal
+    from aiwriter_backend.db.base import Article, Job, Site
+    from aiwriter_backend.services.article_generator import ArticleGenerator
+    
+    # Each DB step gets its own short-lived session so no connection is held
+    # across the long OpenAI awaits; only plain ids are carried between them
+    job_id = None
     try:
-        # Get database session
-        db = next(get_db())
-        
-        # Create a test job
-        from aiwriter_backend.db.base import Job, Site, License, Plan
-        
-        # Check if we have test data
-        site = db.query(Site).first()
-        if not site:
-            print("❌ No test site found. Please run setup_db.py first.")
-            return False
-        
-        # Create a test job
-        job = Job(
-            site_id=site.id,
-            topic="Test Article Topic",
-            length="short",
-            images=False,
-            requested_images=0,
-            language="de",
-            status="pending"
-        )
-        
-        db.add(job)
-        db.commit()
-        db.refresh(job)
+        with SessionLocal() as db:
+            # Check if we have test data
+            site_id = db.execute(select(Site.id).limit(1)).scalar_one_or_none()
+            if site_id is None:
+                print("❌ No test site found. Please run setup_db.py first.")
+                return False
+            
+            # Create a test job; RETURNING hands back the id without a refresh SELECT
+            job_id = db.execute(
+                insert(Job).values(
+                    site_id=site_id,
+                    topic="Test Article Topic",
+                    length="short",
+                    images=False,
+                    requested_images=0,
+                    language="de",
+                    status="pending"
+                ).returning(Job.id)
+            ).scalar_one()
+            db.commit()
         
-        print(f"Created test job: {job.id}")
+        print(f"Created test job: {job_id}")
         
         # Test article generation
-        generator = ArticleGenerator(db)
-        success = await generator.generate_article(job.id)
+        with SessionLocal() as db:
+            generator = ArticleGenerator(db)
+            success = await generator.generate_article(job_id)
         
         if success:
             print("✅ Article generation test passed!")
             
-            # Check the generated article
-            from aiwriter_backend.db.base import Article
-            article = db.query(Article).filter(Article.job_id == job.id).first()
+            # Check the generated article; fetch only the reported columns,
+            # with the HTML length computed server-side instead of loading the body
+            with SessionLocal() as db:
+                article = db.execute(
+                    select(
+                        Article.id,
+                        Article.status,
+                        func.length(Article.article_html),
+                        Article.meta_title
+                    ).where(Article.job_id == job_id).limit(1)
+                ).first()
             if article:
-                print(f"Article created: {article.id}")
-                print(f"Status: {article.status}")
-                print(f"HTML length: {len(article.article_html or '')}")
-                print(f"Meta title: {article.meta_title}")
+                article_id, status, html_length, meta_title = article
+                print(f"Article created: {article_id}")
+                print(f"Status: {status}")
+                print(f"HTML length: {html_length or 0}")
+                print(f"Meta title: {meta_title}")
         else:
             print("❌ Article generation test failed!")
         
-        # Clean up
-        db.delete(job)
-        if 'article' in locals():
-            db.delete(article)
-        db.commit()
-        
         return success
         
     except Exception as e:
         print(f"❌ Article generator test failed: {e}")
         return False
+    finally:
+        # Always remove the test rows, even if generation raised; bulk deletes
+        # load no objects and are no-ops if the rows are already gone
+        if job_id is not None:
+            with SessionLocal() as db:
+                db.execute(delete(Article).where(Article.job_id == job_id))
+                db.execute(delete(Job).where(Job.id == job_id))
+                db.commit()
 
 async def main():
     """Run all tests."""
@@ -113,7 +219,10 @@ async def main():
     print("=" * 50)
     
     # Check if OpenAI API key is set
-    if not settings.OPENAI_API_KEY:
+    if OFFLINE:
+        install_offline_client()
+        print("Offline mode: OpenAI calls are served from canned responses")
+    elif not settings.OPENAI_API_KEY:
         print("❌ OPENAI_API_KEY not set in environment variables")
         print("Please set your OpenAI API key in the .env file")
         return
@@ -124,13 +233,30 @@ async def main():
     print(f"- Max tokens: {settings.OPENAI_MAX_TOKENS_TEXT}")
     print(f"- Temperature: {settings.OPENAI_TEMPERATURE}")
     
-    # Run tests
-    client_test = await test_openai_client()
-    generator_test = await test_article_generator()
+    # Build the shared OpenAI client once; both tests reuse its connection pool
+    from aiwriter_backend.core.openai_client import close_openai, get_openai
+    get_openai()
+    
+    # Run tests concurrently; they are independent and both I/O-bound.
+    # The pool is closed inside this event loop, before asyncio.run() tears it down
+    try:
+        client_test, generator_test = await asyncio.gather(
+            test_openai_client(),
+            test_article_generator(),
+            return_exceptions=True
+        )
+    finally:
+        await close_openai()
+    for name, result in (("OpenAI client", client_test), ("Article generator", generator_test)):
+        if isinstance(result, BaseException):
+            print(f"❌ {name} test raised: {result!r}")
+    generator_skipped = generator_test is None
+    client_test = client_test is True
+    generator_test = generator_skipped or generator_test is True
     
     print("\n=== Test Results ===")
     print(f"OpenAI Client: {'✅ PASS' if client_test else '❌ FAIL'}")
-    print(f"Article Generator: {'✅ PASS' if generator_test else '❌ FAIL'}")
+    print(f"Article Generator: {'⏭️ SKIP' if generator_skipped else '✅ PASS' if generator_test else '❌ FAIL'}")
     
     if client_test and generator_test:
         print("\n🎉 All tests passed! Phase 3 AI Pipeline is working!")
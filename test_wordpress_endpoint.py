@@ -2,44 +2,56 @@
 """
 Test script to verify WordPress endpoint is accessible.
 """
-import requests
+import asyncio
 import json
+import logging
+import os
+import sys
 
-def test_wordpress_endpoint():
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on how much of the response body is read and printed
+BODY_PREVIEW_BYTES = 2048
+
+# Test payload, serialized once at import; every probe sends the same bytes
+PAYLOAD = {
+    "site_id": 1,
+    "job_id": 999,
+    "article_data": {
+        "title": "Test Article",
+        "content_html": "<p>This is a test article.</p>",
+        "meta_title": "Test Article - Meta Title",
+        "meta_description": "Test article meta description",
+        "faq_schema": "{}",
+        "featured_image_url": None
+    },
+    "signature": "test-signature"
+}
+PAYLOAD_BYTES = json.dumps(PAYLOAD).encode("utf-8")
+
+async def test_wordpress_endpoint(client: httpx.AsyncClient):
     """Test if WordPress endpoint is accessible."""
     
     # Test URL
     webhook_url = "https://aiwriter.code-studio.eu/wp-json/aiwriter/v1/publish"
     
-    # Test payload
-    payload = {
-        "site_id": 1,
-        "job_id": 999,
-        "article_data": {
-            "title": "Test Article",
-            "content_html": "<p>This is a test article.</p>",
-            "meta_title": "Test Article - Meta Title",
-            "meta_description": "Test article meta description",
-            "faq_schema": "{}",
-            "featured_image_url": None
-        },
-        "signature": "test-signature"
-    }
-    
     print(f"Testing WordPress endpoint: {webhook_url}")
-    print(f"Payload: {json.dumps(payload, indent=2)}")
+    logger.debug("Payload: %s", PAYLOAD)
     
     try:
-        response = requests.post(
-            webhook_url,
-            json=payload,
-            headers={"Content-Type": "application/json"},
-            timeout=30
-        )
-        
-        print(f"Response Status: {response.status_code}")
-        print(f"Response Headers: {dict(response.headers)}")
-        print(f"Response Body: {response.text}")
+        # Stream the response so an oversized error page is never buffered;
+        # only the first BODY_PREVIEW_BYTES are read for the log
+        async with client.stream("POST", webhook_url, content=PAYLOAD_BYTES) as response:
+            print(f"Response Status: {response.status_code}")
+            print(f"Response Headers: {dict(response.headers)}")
+            
+            body_preview = b""
+            async for chunk in response.aiter_bytes(BODY_PREVIEW_BYTES):
+                body_preview = chunk
+                break
+            print(f"Response Body: {body_preview.decode('utf-8', 'replace')}")
         
         if response.status_code == 200:
             print("✅ WordPress endpoint is working!")
@@ -52,5 +64,22 @@ def test_wordpress_endpoint():
         print(f"❌ Error testing WordPress endpoint: {e}")
         return False
 
+def make_client() -> httpx.AsyncClient:
+    """Build the shared keep-alive client (pooled sockets, connect retries, JSON headers)."""
+    return httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(
+            retries=3,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10)
+        ),
+        headers={"Content-Type": "application/json"},
+        timeout=httpx.Timeout(30.0, connect=5.0)
+    )
+
+async def main() -> bool:
+    """Run the endpoint probe over the shared client and return whether it passed."""
+    async with make_client() as client:
+        return await test_wordpress_endpoint(client)
+
 if __name__ == "__main__":
-    test_wordpress_endpoint()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    sys.exit(0 if asyncio.run(main()) else 1)